@@ -1,5 +1,4 @@
 from datetime import datetime, timedelta
-import os
 import collections
 
 # --- DaVinci Resolve Connection and Project Setup ---
@@ -22,25 +21,56 @@ if not media_pool or not root_folder:
     exit()
 
 
+# --- Resolve API Call Budget ---
+# Every media pool call is a round trip into Resolve, so the passes below batch or
+# cache them: one GetClipProperty() per clip and one MoveClips() per destination bin.
+
 # --- Helper Functions ---
 
+MONTHS = {"Jan": 1, "Feb": 2, "Mar": 3, "Apr": 4, "May": 5, "Jun": 6,
+          "Jul": 7, "Aug": 8, "Sep": 9, "Oct": 10, "Nov": 11, "Dec": 12}
+
+# Maps id(parent folder) -> {sub-folder name: folder}, filled on first lookup under each parent.
+folder_index = {}
+
 def get_or_create_folder(parent, name):
     """Gets an existing folder or creates a new one under the parent."""
-    # Resolve's API doesn't have a direct "get child by name" method.
-    for f in parent.GetSubFolderList():
-        if f.GetName() == name:
-            return f
+    # Resolve's API doesn't have a direct "get child by name" method, so index each
+    # parent's sub-folders once instead of re-listing them for every lookup.
+    children = folder_index.get(id(parent))
+    if children is None:
+        children = folder_index[id(parent)] = {}
+        for f in parent.GetSubFolderList():
+            children.setdefault(f.GetName(), f) # First match wins, as with a linear scan
+    if name in children:
+        return children[name]
     try:
-        return media_pool.AddSubFolder(parent, name)
+        folder = media_pool.AddSubFolder(parent, name)
     except Exception as e:
         print(f"Error creating folder '{name}': {e}")
         return None
+    if folder:
+        children[name] = folder
+    return folder
+
+def parse_resolve_date(date_str):
+    """Parses Resolve's "Date Created" format ("Tue Jun 02 2020 14:03:22") without strptime."""
+    try:
+        _, month, day, year, time_str = date_str.split()
+        hour, minute, second = time_str.split(":")
+        return datetime(int(year), MONTHS[month], int(day), int(hour), int(minute), int(second))
+    except KeyError:
+        raise ValueError(f"Unknown month in date '{date_str}'")
 
 def get_all_clips(folder):
-    """Recursively collects all clips in a folder and its sub-folders."""
-    clips = list(folder.GetClipList()) # Ensure it's a mutable list
-    for sub in folder.GetSubFolderList():
-        clips.extend(get_all_clips(sub))
+    """Collects all clips in a folder and its sub-folders using an explicit stack."""
+    clips = []
+    stack = [folder]
+    while stack:
+        current = stack.pop()
+        clips.extend(current.GetClipList())
+        # Reversed so sub-folders are still visited in bin order
+        stack.extend(reversed(current.GetSubFolderList()))
     return clips
 
 # --- Main Script Logic ---
@@ -52,31 +82,35 @@ videos_folder = get_or_create_folder(root_folder, "Videos")
 pictures_folder = get_or_create_folder(root_folder, "Pictures")
 music_folder = get_or_create_folder(root_folder, "Music")
 
-video_extensions = ['.mp4', '.mov', '.avi', '.mxf', '.mts', '.mkv', '.webm', '.wav', '.lrf', '.srt']
-image_extensions = ['.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff', '.gif']
-audio_extensions = ['.mp3', '.flac']
+# Tuples so each path can be classified with a single str.endswith() call
+video_extensions = ('.mp4', '.mov', '.avi', '.mxf', '.mts', '.mkv', '.webm', '.wav', '.lrf', '.srt')
+image_extensions = ('.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff', '.gif')
+audio_extensions = ('.mp3', '.flac')
 
 # 2. First Pass: Collate all clips by date
 all_clips = get_all_clips(root_folder)
 video_clips_by_date = collections.defaultdict(list)
-other_media_to_move = []
+pictures_to_move = []
+music_to_move = []
 
 print(f"Analyzing {len(all_clips)} clips...")
 
 for clip in all_clips:
-    file_path = clip.GetClipProperty("File Path")
+    # Fetch every property in one call; each GetClipProperty is a round trip into Resolve.
+    props = clip.GetClipProperty() or {}
+    file_path = props.get("File Path")
     if not file_path:
         continue
     
-    ext = os.path.splitext(file_path)[1].lower()
+    lower_path = file_path.lower()
 
-    if ext in video_extensions:
-        date_str = clip.GetClipProperty("Date Created")
+    if lower_path.endswith(video_extensions):
+        date_str = props.get("Date Created")
         if not date_str:
             continue
         try:
             # Parse the creation date string provided by Resolve
-            dt = datetime.strptime(date_str, "%a %b %d %Y %H:%M:%S")
+            dt = parse_resolve_date(date_str)
             
             # If a clip was shot between midnight and 3 AM, assign it to the previous day
             if dt.hour < 3:
@@ -86,46 +120,39 @@ for clip in all_clips:
             video_clips_by_date[bin_date].append(clip)
         except (ValueError, TypeError):
             print(f"Could not parse date for clip '{clip.GetName()}': '{date_str}'")
-    elif ext in image_extensions or ext in audio_extensions:
-        other_media_to_move.append((clip, ext))
+    elif lower_path.endswith(image_extensions):
+        pictures_to_move.append(clip)
+    elif lower_path.endswith(audio_extensions):
+        music_to_move.append(clip)
 
 # 3. Second Pass: Determine grouping for video dates
 GROUPING_THRESHOLD = 20
 MAX_GROUP_SPAN_DAYS = 7
 sorted_dates = sorted(video_clips_by_date.keys())
 grouped_dates = []
-i = 0
 
-while i < len(sorted_dates):
-    current_date = sorted_dates[i]
-    num_clips = len(video_clips_by_date[current_date])
+# Single sweep: carry the open run of "small" days and close it when the next
+# date is big, not consecutive, or would push the run past the maximum span.
+small_group = None
+group_start = previous_date = None
 
+for current_date in sorted_dates:
     # If clip count is over the threshold, it's its own group
-    if num_clips > GROUPING_THRESHOLD:
+    if len(video_clips_by_date[current_date]) > GROUPING_THRESHOLD:
         grouped_dates.append([current_date])
-        i += 1
+        small_group = None
         continue
 
-    # This is a "small" day, so start a potential group
-    small_group = [current_date]
-    j = i + 1
-    while j < len(sorted_dates):
-        next_date = sorted_dates[j]
-        
-        # Check if the next day meets all grouping criteria
-        is_consecutive = (next_date - small_group[-1]).days == 1
-        is_small = len(video_clips_by_date[next_date]) <= GROUPING_THRESHOLD
-        span_ok = (next_date - small_group[0]).days < MAX_GROUP_SPAN_DAYS
-
-        if is_consecutive and is_small and span_ok:
-            small_group.append(next_date)
-            j += 1
-        else:
-            # Stop grouping if criteria are not met
-            break
-            
-    grouped_dates.append(small_group)
-    i = j # Move the main index to the end of the processed group
+    if (small_group is not None
+            and (current_date - previous_date).days == 1
+            and (current_date - group_start).days < MAX_GROUP_SPAN_DAYS):
+        small_group.append(current_date)
+    else:
+        # This is a "small" day that can't join the open run, so it starts a new one
+        small_group = [current_date]
+        grouped_dates.append(small_group)
+        group_start = current_date
+    previous_date = current_date
 
 # 4. Third Pass: Create folders and move video clips
 print("Creating folders and moving video clips...")
@@ -154,12 +181,11 @@ for group in grouped_dates:
     if clips_to_move:
         media_pool.MoveClips(clips_to_move, date_folder)
 
-# 5. Final Pass: Move other media types
+# 5. Final Pass: Move other media types, one batched call per bin
 print("Moving pictures and music files...")
-for clip, ext in other_media_to_move:
-    if ext in image_extensions:
-        media_pool.MoveClips([clip], pictures_folder)
-    elif ext in audio_extensions:
-        media_pool.MoveClips([clip], music_folder)
+if pictures_to_move:
+    media_pool.MoveClips(pictures_to_move, pictures_folder)
+if music_to_move:
+    media_pool.MoveClips(music_to_move, music_folder)
 
 print("Script finished successfully.")
\ No newline at end of file
@@ -1,11 +1,10 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 import re
-from datetime import datetime, timedelta, timezone
+import collections
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 import os
-import platform
-import stat
-import statistics
 
 # --- DaVinci Resolve Connection and Project Setup ---
 try:
@@ -18,8 +17,53 @@ projectManager = resolve.GetProjectManager()
 project = projectManager.GetCurrentProject()
 mediaPool = project.GetMediaPool()
 
+# --- Filename Parsing ---
+# Compiled once at import; each pattern captures YYYYMMDD + HHMMSS, optionally with milliseconds.
+FILENAME_DT_PATTERNS = [
+    re.compile(r'(\d{8})[_-]?(\d{6})(?!\d)'),
+    re.compile(r'(\d{8})_?(\d{6})(\d{3})'),
+    re.compile(r'(\d{4})-(\d{2})-(\d{2})-(\d{2})-(\d{2})-(\d{2})-(\d{3})')
+]
+PREFIX_RE = re.compile(r'([a-zA-Z_]+)')
+# English month abbreviations for the 'Scene' date, independent of the system locale used by %b
+SCENE_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+# Default for the 'Parallel read' checkbox: read clip names/properties on worker threads during a
+# rescan. Off by default; the checkbox applies from the next Scan/Apply/Restore.
+USER_PARALLEL_FETCH = False
+
 # --- Main Application Class ---
 class TimecodeToolApp(tk.Tk):
+    # Log lines are written to the widget in batches of this size
+    _LOG_FLUSH_LINES = 100
+    # Worker threads used to read clip names/properties over the Resolve bridge when 'Parallel read' is on
+    _FETCH_WORKERS = 8
+    # Clips between progress label refreshes during apply/restore
+    _PROGRESS_EVERY = 100
+
+    # --- Style Configuration ---
+    _STYLE_SPEC = {
+        '.': dict(background='#2E2E2E', foreground='#E0E0E0', fieldbackground='#3C3C3C', bordercolor="#555555"),
+        'TLabel': dict(font=('Segoe UI', 10)),
+        'TButton': dict(font=('Segoe UI', 10, 'bold'), padding=6, background='#555555', foreground='#FFFFFF'),
+        'TCheckbutton': dict(font=('Segoe UI', 10), indicatorrelief=tk.FLAT),
+        'TRadiobutton': dict(font=('Segoe UI', 10)),
+        'TCombobox': dict(font=('Segoe UI', 10), fieldbackground='#3C3C3C'),
+        'TEntry': dict(font=('Segoe UI', 10), fieldbackground='#3C3C3C'),
+        'TFrame': dict(background='#2E2E2E'),
+        'Header.TLabel': dict(font=('Segoe UI', 14, 'bold'), foreground='#00A1DE'),
+    }
+    # Fix for hover/active state making text unreadable with a more contrasting color
+    _ACTIVE_TOGGLE_MAP = dict(
+        background=[('active', '#4A4A4A')],
+        indicatorbackground=[('active', '#4A4A4A')],
+        foreground=[('active', '#FFFFFF')])
+    _STYLE_MAP = {
+        'TButton': dict(background=[('active', '#6A6A6A')]),
+        'TCheckbutton': _ACTIVE_TOGGLE_MAP,
+        'TRadiobutton': _ACTIVE_TOGGLE_MAP,
+    }
+
     def __init__(self, resolve_app):
         super().__init__()
         self.resolve = resolve_app
@@ -34,33 +78,22 @@ class TimecodeToolApp(tk.Tk):
         self.style.theme_use('clam')
         self.configure(bg='#2E2E2E')
 
-        # --- Style Configuration ---
-        self.style.configure('.', background='#2E2E2E', foreground='#E0E0E0', fieldbackground='#3C3C3C', bordercolor="#555555")
-        self.style.configure('TLabel', font=('Segoe UI', 10))
-        self.style.configure('TButton', font=('Segoe UI', 10, 'bold'), padding=6, background='#555555', foreground='#FFFFFF')
-        self.style.map('TButton', background=[('active', '#6A6A6A')])
-        self.style.configure('TCheckbutton', font=('Segoe UI', 10), indicatorrelief=tk.FLAT)
-        self.style.configure('TRadiobutton', font=('Segoe UI', 10))
-        self.style.configure('TCombobox', font=('Segoe UI', 10), fieldbackground='#3C3C3C')
-        self.style.configure('TEntry', font=('Segoe UI', 10), fieldbackground='#3C3C3C')
-        self.style.configure('TFrame', background='#2E2E2E')
-        self.style.configure('Header.TLabel', font=('Segoe UI', 14, 'bold'), foreground='#00A1DE')
-
-        # Fix for hover/active state making text unreadable with a more contrasting color
-        active_bg = '#4A4A4A'
-        self.style.map('TCheckbutton',
-            background=[('active', active_bg)],
-            indicatorbackground=[('active', active_bg)],
-            foreground=[('active', '#FFFFFF')])
-        self.style.map('TRadiobutton',
-            background=[('active', active_bg)],
-            indicatorbackground=[('active', active_bg)],
-            foreground=[('active', '#FFFFFF')])
+        for style_name, options in self._STYLE_SPEC.items():
+            self.style.configure(style_name, **options)
+        for style_name, options in self._STYLE_MAP.items():
+            self.style.map(style_name, **options)
 
         self.filename_prefixes = ["All"]
         self.clips_to_process = []
+        self._all_clips = []
+        self._prop_cache = {}
+        self._name_cache = {}
+        self._file_dt_cache = {}
+        self._name_dt_cache = {}
+        self._log_buf = []
         self._create_widgets()
         self._populate_prefix_dropdown()
+        self._flush_log()
         self._on_source_option_change() # Set initial state of widgets
 
     def _create_widgets(self):
@@ -136,12 +169,15 @@ class TimecodeToolApp(tk.Tk):
 
         self.backup_tc_var = tk.BooleanVar(value=True)
         ttk.Checkbutton(adv_frame, text="Backup original 'Start TC' to 'Slate TC'", variable=self.backup_tc_var).grid(row=2, column=0, columnspan=2, sticky='w', pady=2)
+
+        self.parallel_fetch_var = tk.BooleanVar(value=USER_PARALLEL_FETCH)
+        ttk.Checkbutton(adv_frame, text="Parallel read (fetch clip properties on several threads)", variable=self.parallel_fetch_var).grid(row=3, column=0, columnspan=2, sticky='w', pady=2)
         
         # Timezone Adjustment
-        ttk.Label(adv_frame, text="Timezone Hour Adjustment:").grid(row=3, column=0, padx=5, pady=(10, 5), sticky="w")
+        ttk.Label(adv_frame, text="Timezone Hour Adjustment:").grid(row=4, column=0, padx=5, pady=(10, 5), sticky="w")
         self.tz_offset_var = tk.DoubleVar(value=0.0)
         self.tz_offset_spinbox = tk.Spinbox(adv_frame, from_=-24.0, to=24.0, increment=0.5, textvariable=self.tz_offset_var, width=6, font=('Segoe UI', 10), bg='#3C3C3C', fg='#E0E0E0', buttonbackground='#555555')
-        self.tz_offset_spinbox.grid(row=3, column=1, padx=5, pady=(10,5), sticky="w")
+        self.tz_offset_spinbox.grid(row=4, column=1, padx=5, pady=(10,5), sticky="w")
 
 
         # --- RIGHT COLUMN FRAME ---
@@ -172,6 +208,9 @@ class TimecodeToolApp(tk.Tk):
         self.log_text = scrolledtext.ScrolledText(log_frame, wrap=tk.WORD, height=15, bg='#1E1E1E', fg='#D4D4D4', font=('Consolas', 9))
         self.log_text.grid(row=0, column=0, sticky='nsew')
 
+        self.progress_var = tk.StringVar(value="")
+        ttk.Label(right_column_frame, textvariable=self.progress_var).grid(row=2, column=0, sticky='w', pady=(5, 0))
+
 
     def _on_source_option_change(self):
         """Enable/disable widgets based on the source logic selection."""
@@ -187,81 +226,129 @@ class TimecodeToolApp(tk.Tk):
             self.modify_date_radio.config(state=tk.DISABLED)
 
     def _log(self, message):
-        self.log_text.insert(tk.END, message + "\n")
+        self._log_buf.append(message)
+        if len(self._log_buf) >= self._LOG_FLUSH_LINES:
+            self._flush_log()
+
+    def _flush_log(self):
+        """Writes buffered log lines to the log widget in a single insert and redraw."""
+        if not self._log_buf:
+            return
+        self.log_text.insert(tk.END, "\n".join(self._log_buf) + "\n")
+        self._log_buf.clear()
         self.log_text.see(tk.END)
         self.update_idletasks()
 
+    def _show_progress(self, text):
+        """Updates the single progress line under the log without touching the log widget."""
+        self.progress_var.set(text)
+        self.update_idletasks()
+
     def _populate_prefix_dropdown(self):
         """Scans the media pool to find unique filename prefixes."""
         if not self.media_pool:
             self._log("Error: Could not access Media Pool.")
             return
         
-        prefixes = set()
-        root_folder = self.media_pool.GetRootFolder()
-        clips = self._get_all_clips(root_folder)
-        
-        for clip in clips:
-            name = clip.GetName()
-            if len(name) >= 3:
-                match = re.match(r'([a-zA-Z_]+)', name)
-                if match:
-                    prefixes.add(match.group(1).rstrip('_'))
-                elif name[0].isdigit():
-                    prefixes.add(name[:4])
-                else:
-                     prefixes.add(name[:3])
+        clips = self._rescan_media_pool()
+        prefixes = {p for p in map(self._extract_prefix, map(self._get_clip_name, clips)) if p}
 
         self.filename_prefixes = ["All"] + sorted(list(prefixes))
         self.prefix_combo['values'] = self.filename_prefixes
         self._log(f"Found {len(prefixes)} unique filename prefixes.")
 
+    @staticmethod
+    def _extract_prefix(name):
+        """Returns the filename prefix used to group clips, or None for names that are too short."""
+        if len(name) < 3:
+            return None
+        match = PREFIX_RE.match(name)
+        if match:
+            return match.group(1).rstrip('_')
+        return name[:4] if name[0].isdigit() else name[:3]
+
     def _get_all_clips(self, folder):
-        """Recursively gets all clips from a folder and its subfolders."""
+        """Gets all clips from a folder and its subfolders, walking the tree with an explicit stack."""
         clips = []
-        if hasattr(folder, "GetClipList"):
-             clips.extend(folder.GetClipList())
-        if hasattr(folder, "GetSubFolderList"):
-            for subfolder in folder.GetSubFolderList():
-                clips.extend(self._get_all_clips(subfolder))
+        stack = [folder]
+        while stack:
+            current = stack.pop()
+            if hasattr(current, "GetClipList"):
+                clips.extend(current.GetClipList())
+            if hasattr(current, "GetSubFolderList"):
+                # Reversed so subfolders are still visited in bin order
+                stack.extend(reversed(current.GetSubFolderList()))
         return clips
+
+    def _rescan_media_pool(self):
+        """Walks the media pool once and caches every clip's name and properties for the current operation."""
+        self._file_dt_cache = {}
+        if not self.media_pool:
+            self._all_clips, self._prop_cache, self._name_cache = [], {}, {}
+            return self._all_clips
+        self._all_clips = self._get_all_clips(self.media_pool.GetRootFolder())
+        # One bulk GetClipProperty() per clip instead of a bridge call per property read. With
+        # 'Parallel read' on, the reads are overlapped on worker threads; all writes
+        # (SetClipProperty) stay on the main thread either way.
+        if self.parallel_fetch_var.get():
+            with ThreadPoolExecutor(max_workers=self._FETCH_WORKERS) as executor:
+                fetched = list(executor.map(self._fetch_clip_data, self._all_clips))
+        else:
+            fetched = [self._fetch_clip_data(clip) for clip in self._all_clips]
+        self._name_cache = {id(clip): name for clip, (name, _) in zip(self._all_clips, fetched)}
+        self._prop_cache = {id(clip): props for clip, (_, props) in zip(self._all_clips, fetched)}
+        return self._all_clips
+
+    @staticmethod
+    def _fetch_clip_data(clip):
+        """Reads a clip's name and full property dict (on a worker thread when 'Parallel read' is on)."""
+        return clip.GetName(), clip.GetClipProperty() or {}
+
+    def _get_clip_property(self, clip, name):
+        """Reads a clip property from the cache built by the last rescan."""
+        props = self._prop_cache.get(id(clip))
+        if props is None:
+            return clip.GetClipProperty(name)
+        return props.get(name)
+
+    def _get_clip_name(self, clip):
+        """Reads a clip name from the cache built by the last rescan."""
+        name = self._name_cache.get(id(clip))
+        return name if name is not None else clip.GetName()
         
-    def _filter_clips(self, by_prefix=None):
+    def _filter_clips(self):
         """Filters clips based on the user's selection in the GUI."""
         if not self.media_pool:
             self._log("Error: Could not access Media Pool. Cannot filter clips.")
             return []
 
-        root_folder = self.media_pool.GetRootFolder()
-        all_clips = self._get_all_clips(root_folder)
+        all_clips = self._all_clips
         
-        prefix = by_prefix if by_prefix else self.prefix_var.get()
+        prefix = self.prefix_var.get()
         wildcard = self.wildcard_var.get().strip()
         
-        # If a prefix is passed directly, ignore wildcard
-        use_wildcard = not bool(by_prefix) 
+        wildcard_re = None
+        if wildcard:
+            pattern = wildcard.replace('.', r'\.').replace('*', '.*').replace('?', '.')
+            wildcard_re = re.compile(pattern, re.IGNORECASE)
         
-        filtered_clips = []
-        for clip in all_clips:
-            name = clip.GetName()
-            if use_wildcard and wildcard:
-                pattern = wildcard.replace('.', r'\.').replace('*', '.*').replace('?', '.')
-                if re.match(pattern, name, re.IGNORECASE):
-                    filtered_clips.append(clip)
-            elif prefix == "All" or name.startswith(prefix):
-                filtered_clips.append(clip)
-        
-        if by_prefix: # If filtering for analysis, we don't need the other checks
-            return filtered_clips
+        # Checkbox states are read once, not per clip; each clip goes through every test in one pass
+        match_all = not wildcard_re and prefix == "All"
+        skip_in_timeline = self.skip_in_timeline_var.get()
+        only_if_null = self.only_if_null_var.get()
 
         final_list = []
-        for clip in filtered_clips:
-            if self.skip_in_timeline_var.get():
-                usage_str = clip.GetClipProperty("Usage")
+        for clip in all_clips:
+            if not match_all:
+                name = self._get_clip_name(clip)
+                if not (wildcard_re.match(name) if wildcard_re else name.startswith(prefix)):
+                    continue
+            if skip_in_timeline:
+                usage_str = self._get_clip_property(clip, "Usage")
                 if usage_str and int(usage_str) > 0:
                     continue
-            if self.only_if_null_var.get():
-                start_tc = clip.GetClipProperty("Start TC")
+            if only_if_null:
+                start_tc = self._get_clip_property(clip, "Start TC")
                 if start_tc and start_tc.strip() and start_tc != "00:00:00:00":
                     continue
             final_list.append(clip)
@@ -270,57 +357,71 @@ class TimecodeToolApp(tk.Tk):
         return final_list
         
     def _parse_datetime_from_filename(self, filename):
+        """Extracts a datetime from a filename, memoized per name since parsing is pure."""
+        # Kept across rescans: a name always parses to the same datetime (or None)
+        try:
+            return self._name_dt_cache[filename]
+        except KeyError:
+            dt = self._name_dt_cache[filename] = self._match_filename_datetime(filename)
+            return dt
+
+    def _match_filename_datetime(self, filename):
         """Tries various regex patterns to extract datetime from a filename."""
-        patterns = [
-            r'(\d{8})[_-]?(\d{6})(?!\d)',
-            r'(\d{8})_?(\d{6})(\d{3})',
-            r'(\d{4})-(\d{2})-(\d{2})-(\d{2})-(\d{2})-(\d{2})-(\d{3})'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, filename)
+        for pattern in FILENAME_DT_PATTERNS:
+            match = pattern.search(filename)
             if match:
                 try:
-                    parts = match.groups()
-                    if len(parts) == 2:
-                        dt_str = ''.join(parts)
-                        return datetime.strptime(dt_str, '%Y%m%d%H%M%S')
-                    elif len(parts) == 3:
-                        dt_str = ''.join(parts)
-                        return datetime.strptime(dt_str, '%Y%m%d%H%M%S%f')
-                    elif len(parts) == 7:
-                        dt_str = f"{''.join(parts)}"
-                        return datetime.strptime(dt_str, '%Y%m%d%H%M%S%f')
+                    # Every pattern's groups join into YYYYMMDDHHMMSS plus optional milliseconds
+                    p = ''.join(match.groups())
+                    microsecond = int(p[14:17]) * 1000 if len(p) > 14 else 0
+                    return datetime(int(p[0:4]), int(p[4:6]), int(p[6:8]),
+                                    int(p[8:10]), int(p[10:12]), int(p[12:14]), microsecond)
                 except ValueError:
                     continue
         return None
         
     def _get_file_datetime(self, clip, date_type='create'):
         """Gets creation or modification datetime for a clip's file path."""
-        file_path = clip.GetClipProperty("File Path")
+        create_dt, modify_dt = self._get_file_datetimes(clip)
+        return create_dt if date_type == 'create' else modify_dt
+
+    def _get_file_datetimes(self, clip):
+        """Gets both (creation, modification) datetimes for a clip's file path from a single stat."""
+        file_path = self._get_clip_property(clip, "File Path")
         if not file_path:
-            return None
+            return None, None
+        # Several clips can share a file, and each one is asked for both dates
+        file_dates = self._file_dt_cache.get(file_path)
+        if file_dates is None:
+            file_dates = self._file_dt_cache[file_path] = self._read_file_datetimes(file_path)
+        return file_dates
+
+    def _get_all_dates(self, clip):
+        """Gets the (filename, creation, modification) datetimes for a clip."""
+        create_dt, modify_dt = self._get_file_datetimes(clip)
+        return self._parse_datetime_from_filename(self._get_clip_name(clip)), create_dt, modify_dt
+
+    def _read_file_datetimes(self, file_path):
+        """Stats a file once and returns its (creation, modification) datetimes."""
         try:
             stat_info = os.stat(file_path)
-            if date_type == 'create':
-                ts = getattr(stat_info, 'st_birthtime', stat_info.st_ctime)
-            else:
-                ts = stat_info.st_mtime
-            return datetime.fromtimestamp(ts)
-        except (OSError, FileNotFoundError) as e:
+        except OSError as e:
             self._log(f"Error accessing file path '{file_path}': {e}")
-            return None
+            return None, None
+        create_ts = getattr(stat_info, 'st_birthtime', stat_info.st_ctime)
+        return datetime.fromtimestamp(create_ts), datetime.fromtimestamp(stat_info.st_mtime)
 
     def _get_best_datetime(self, clip):
-        """Determines the best datetime for a clip based on user settings."""
+        """Determines the best datetime for a clip based on user settings (naive, local wall-clock)."""
         dt = None
         source = "Unknown"
 
         if self.source_logic_var.get() == "earliest":
+            name_dt, create_dt, modify_dt = self._get_all_dates(clip)
             sources = {
-                "Filename": self._parse_datetime_from_filename(clip.GetName()),
-                "Creation": self._get_file_datetime(clip, 'create'),
-                "Modification": self._get_file_datetime(clip, 'modify')
+                "Filename": name_dt,
+                "Creation": create_dt,
+                "Modification": modify_dt
             }
             valid_sources = {k: v for k, v in sources.items() if v is not None}
             if not valid_sources:
@@ -333,7 +434,7 @@ class TimecodeToolApp(tk.Tk):
 
         else: # Priority logic
             if self.parse_filename_var.get():
-                dt = self._parse_datetime_from_filename(clip.GetName())
+                dt = self._parse_datetime_from_filename(self._get_clip_name(clip))
                 if dt: source = "Filename"
             
             if not dt:
@@ -349,72 +450,84 @@ class TimecodeToolApp(tk.Tk):
             dt += timedelta(hours=offset_hours)
             source += f" (Adjusted by {offset_hours}h)"
 
-        return dt.astimezone(), source
+        return dt, source
+
+    @staticmethod
+    def _compute_timecode(hour, minute, second, microsecond, fps):
+        """Converts a time of day to an (hh, mm, ss, ff) timecode at the given frame rate."""
+        # Same value as (dt - midnight).total_seconds(), without building two datetimes and a timedelta
+        total_seconds = ((hour * 3600 + minute * 60 + second) * 10**6 + microsecond) / 10**6
+        total_frames = int(total_seconds * fps) % int(24 * 3600 * fps)
+
+        fps_int = int(round(fps))
+        ff = total_frames % fps_int
+        mm, ss = divmod(total_frames // fps_int, 60)
+        hh, mm = divmod(mm, 60)
+        return hh, mm, ss, ff
 
     def _format_timedelta(self, td):
         """Formats a timedelta into a human-readable string."""
         if td is None: return "N/A"
         
-        td_abs = abs(td)
-        days, remainder = divmod(td_abs.total_seconds(), 86400)
+        days, remainder = divmod(int(abs(td).total_seconds()), 86400)
         hours, remainder = divmod(remainder, 3600)
         minutes, seconds = divmod(remainder, 60)
         
-        parts = []
-        if days > 0: parts.append(f"{int(days)}d")
-        if hours > 0: parts.append(f"{int(hours)}h")
-        if minutes > 0: parts.append(f"{int(minutes)}m")
-        if not parts and seconds > 0: parts.append(f"{int(seconds)}s")
-        if not parts: return "0s"
-        
-        return " ".join(parts)
+        if not (days or hours or minutes): return f"{seconds}s"
+        return ((f"{days}d " if days else "") + (f"{hours}h " if hours else "") + (f"{minutes}m" if minutes else "")).rstrip()
 
     def scan_and_analyze(self):
         """Scans clips and provides a summarized log of discrepancies by prefix."""
         self.log_text.delete(1.0, tk.END)
+        self._show_progress("") # Clear the previous action's final count
         self._log("--- Starting Discrepancy Analysis ---")
-        
-        # Get all prefixes from the dropdown to iterate through
-        all_prefixes = self.prefix_combo['values']
-        if not all_prefixes or "All" in self.prefix_var.get():
-            # If "All" is selected, we need to gather all prefixes from the clips themselves
-            all_clips = self._get_all_clips(self.media_pool.GetRootFolder())
-            prefixes_from_clips = set()
-            for clip in all_clips:
-                name = clip.GetName()
-                match = re.match(r'([a-zA-Z_]+|\d{4})', name)
-                if match:
-                    prefixes_from_clips.add(match.group(1).rstrip('_'))
-                elif len(name) >=3:
-                     prefixes_from_clips.add(name[:3] if not name[:3].isdigit() else name[:4])
-            prefixes_to_scan = sorted(list(prefixes_from_clips))
+
+        # Walk the media pool once; every prefix below is matched against the cached names
+        all_clips = self._rescan_media_pool()
+        clip_names = [(clip, self._get_clip_name(clip)) for clip in all_clips]
+        if "All" in self.prefix_var.get():
+            prefixes = set()
+            for _, name in clip_names:
+                prefix = self._extract_prefix(name)
+                if prefix is None: # Names under 3 characters are still scanned under their leading letters
+                    match = PREFIX_RE.match(name)
+                    prefix = match.group(1).rstrip('_') if match else None
+                if prefix:
+                    prefixes.add(prefix)
+            prefixes_to_scan = sorted(prefixes)
         else:
             prefixes_to_scan = [self.prefix_var.get()]
+        # Same startswith() rule as _filter_clips, so each prefix is analyzed on exactly the clips
+        # Apply/Restore would change with that prefix selected (a clip can fall under several prefixes)
+        clips_by_prefix = {prefix: [clip for clip, name in clip_names if name.startswith(prefix)] for prefix in prefixes_to_scan}
 
-        if not prefixes_to_scan: self._log("No clips found to analyze."); return
+        if not prefixes_to_scan: self._log("No clips found to analyze."); self._flush_log(); return
 
         for prefix in prefixes_to_scan:
-            clips_in_prefix = self._filter_clips(by_prefix=prefix)
+            clips_in_prefix = clips_by_prefix.get(prefix)
             if not clips_in_prefix: continue
             
             self._log(f"===== Prefix: {prefix} ({len(clips_in_prefix)} clips) =====")
 
-            all_deltas = {'cn': [], 'mn': [], 'mc': []}
-            for clip in clips_in_prefix:
-                dts = {
-                    'name': self._parse_datetime_from_filename(clip.GetName()),
-                    'create': self._get_file_datetime(clip, 'create'),
-                    'modify': self._get_file_datetime(clip, 'modify')
-                }
-                if dts['create'] and dts['name']: all_deltas['cn'].append((dts['create'] - dts['name']).total_seconds())
-                if dts['modify'] and dts['name']: all_deltas['mn'].append((dts['modify'] - dts['name']).total_seconds())
-                if dts['modify'] and dts['create']: all_deltas['mc'].append((dts['modify'] - dts['create']).total_seconds())
+            # Aligned per-clip columns, gathered once and shared by the delta pass and the example search
+            names = [self._get_clip_name(clip) for clip in clips_in_prefix]
+            name_dts, create_dts, modify_dts = zip(*map(self._get_all_dates, clips_in_prefix))
+            columns = {'name': name_dts, 'create': create_dts, 'modify': modify_dts}
+
+            def column_deltas(later, earlier):
+                # Stays aligned with the clip columns; None where either date is missing
+                return [(a - b).total_seconds() if a and b else None for a, b in zip(later, earlier)]
+
+            all_deltas = {
+                'cn': column_deltas(create_dts, name_dts),
+                'mn': column_deltas(modify_dts, name_dts),
+                'mc': column_deltas(modify_dts, create_dts),
+            }
 
             def get_mode_delta(deltas):
-                if not deltas: return None
-                rounded = [round(d / 60) * 60 for d in deltas] # Round to nearest minute
-                try: return statistics.mode(rounded)
-                except statistics.ModeError: return statistics.mean(deltas)
+                # Round to nearest minute; ties go to the first value seen, as with statistics.mode
+                counts = collections.Counter(round(d / 60) * 60 for d in deltas if d is not None)
+                return counts.most_common(1)[0][0] if counts else None
 
             mode_cn = get_mode_delta(all_deltas['cn'])
             mode_mn = get_mode_delta(all_deltas['mn'])
@@ -448,49 +561,49 @@ class TimecodeToolApp(tk.Tk):
                     relation = "after" if mode_delta >= 0 else "before"
                     self._log(f"  - Most common offset: {source1} is {self._format_timedelta(timedelta(seconds=mode_delta))} {relation} {source2}.")
 
-                    # Find examples for this specific discrepancy
-                    examples = []
-                    for clip in clips_in_prefix:
-                        dts = {
-                            'name': self._parse_datetime_from_filename(clip.GetName()),
-                            'create': self._get_file_datetime(clip, 'create'),
-                            'modify': self._get_file_datetime(clip, 'modify')
-                        }
-                        s1_key, s2_key = source1.lower(), source2.lower()
-                        if dts[s1_key] and dts[s2_key]:
-                            delta = (dts[s1_key] - dts[s2_key]).total_seconds()
-                            if abs(delta - mode_delta) < 60: # Matches the mode
-                                examples.append((clip.GetName(), dts[s1_key], dts[s2_key]))
+                    # Find examples for this specific discrepancy, reusing the deltas computed for the mode.
+                    # Earliest and latest matching clip by source1 date, tracked in one pass (no sort).
+                    # Ties keep the first clip for first_ex and the last clip for last_ex, as a stable sort would.
+                    first_ex = last_ex = None
+                    example_count = 0
+                    for name, dt1, dt2, delta in zip(names, columns[source1.lower()], columns[source2.lower()], all_deltas[key]):
+                        if delta is not None and abs(delta - mode_delta) < 60: # Matches the mode
+                            example_count += 1
+                            if first_ex is None or dt1 < first_ex[1]: first_ex = (name, dt1, dt2)
+                            if last_ex is None or dt1 >= last_ex[1]: last_ex = (name, dt1, dt2)
                     
-                    if examples:
-                        examples.sort(key=lambda x: x[1]) # Sort by date
-                        first_ex = examples[0]
-                        last_ex = examples[-1]
+                    if example_count:
                         self._log("    - Example Discrepancy:")
                         self._log(f"      - First Clip: {first_ex[0]}")
-                        self._log(f"        - {source1}: {first_ex[1].strftime('%Y-%m-%d %H:%M:%S')}")
-                        self._log(f"        - {source2}: {first_ex[2].strftime('%Y-%m-%d %H:%M:%S')}")
-                        if len(examples) > 1:
+                        self._log(f"        - {source1}: {first_ex[1].isoformat(' ', 'seconds')}")
+                        self._log(f"        - {source2}: {first_ex[2].isoformat(' ', 'seconds')}")
+                        if example_count > 1:
                             self._log(f"      - Last Clip:  {last_ex[0]}")
-                            self._log(f"        - {source1}: {last_ex[1].strftime('%Y-%m-%d %H:%M:%S')}")
-                            self._log(f"        - {source2}: {last_ex[2].strftime('%Y-%m-%d %H:%M:%S')}")
+                            self._log(f"        - {source1}: {last_ex[1].isoformat(' ', 'seconds')}")
+                            self._log(f"        - {source2}: {last_ex[2].isoformat(' ', 'seconds')}")
             self._log("")
+        self._flush_log()
 
     def apply_changes(self):
         """Main function to apply the timecode and date changes."""
         self.log_text.delete(1.0, tk.END)
+        self._show_progress("") # Clear the previous action's final count
         self._log("--- Applying Changes ---")
+        self._rescan_media_pool()
         
         clips = self._filter_clips()
+        self._flush_log()
         if not clips: return
             
         if not messagebox.askyesno("Confirm Changes", f"You are about to modify {len(clips)} clips. Are you sure you want to proceed?"):
-            self._log("Operation cancelled by user."); return
+            self._log("Operation cancelled by user."); self._flush_log(); return
 
         success_count, fail_count = 0, 0
 
-        for clip in clips:
-            name = clip.GetName()
+        for i, clip in enumerate(clips, 1):
+            if i % self._PROGRESS_EVERY == 0:
+                self._show_progress(f"Applying changes: {i}/{len(clips)} clips")
+            name = self._get_clip_name(clip)
             self._log(f"Processing: {name}")
 
             dt, source = self._get_best_datetime(clip)
@@ -500,33 +613,23 @@ class TimecodeToolApp(tk.Tk):
             
             # Per user feedback, format date as 'Mmm dd maxGoto HH:MM:SS'
             # Example: 'Jun 23 2025 19:37:00'
-            scene_date_str = dt.strftime("%b %d %Y %H:%M:%S")
+            scene_date_str = f"{SCENE_MONTHS[dt.month - 1]} {dt.day:02d} {dt.year} {dt.hour:02d}:{dt.minute:02d}:{dt.second:02d}"
             
             try:
-                fps_str = clip.GetClipProperty("FPS")
+                fps_str = self._get_clip_property(clip, "FPS")
                 if not fps_str: raise ValueError("FPS is null")
                 fps = float(fps_str)
                 if fps <= 0: raise ValueError("Invalid FPS")
             except (ValueError, TypeError, AttributeError) as e:
                 self._log(f"  -> FAILED: Could not determine valid FPS for clip ({e}). Skipping."); fail_count += 1; continue
 
-            midnight = dt.replace(hour=0, minute=0, second=0, microsecond=0)
-            total_frames = int((dt - midnight).total_seconds() * fps)
-            
-            frames_in_day = int(24 * 3600 * fps)
-            total_frames %= frames_in_day
-
-            ff = total_frames % int(round(fps))
-            total_seconds_int = total_frames // int(round(fps))
-            mm, ss = divmod(total_seconds_int, 60)
-            hh, mm = divmod(mm, 60)
-            
+            hh, mm, ss, ff = self._compute_timecode(dt.hour, dt.minute, dt.second, dt.microsecond, fps)
             new_tc = f"{hh:02d}:{mm:02d}:{ss:02d}:{ff:02d}"
 
             set_backup_ok, set_tc_ok, set_date_ok = True, True, True
             
             if self.backup_tc_var.get():
-                original_tc = clip.GetClipProperty("Start TC")
+                original_tc = self._get_clip_property(clip, "Start TC")
                 if original_tc and original_tc.strip():
                     set_backup_ok = clip.SetClipProperty("Slate TC", original_tc)
 
@@ -545,32 +648,41 @@ class TimecodeToolApp(tk.Tk):
                 fail_count += 1
 
         self._log(f"\n--- Summary ---\nSuccessfully updated: {success_count} clips.\nFailed or skipped: {fail_count} clips.")
+        self._flush_log()
+        self._show_progress(f"Finished: {len(clips)} clips processed.")
         messagebox.showinfo("Operation Complete", f"Successfully updated {success_count} clips.\nFailed or skipped {fail_count} clips.\n\nSee log for details.")
 
     def restore_from_backup(self):
         """Restores 'Start TC' from 'Slate TC'."""
         self.log_text.delete(1.0, tk.END)
+        self._show_progress("") # Clear the previous action's final count
         self._log("--- Restoring 'Start TC' from 'Slate TC' Backup ---")
+        self._rescan_media_pool()
         
         clips = self._filter_clips()
+        self._flush_log()
         if not clips: return
 
         if not messagebox.askyesno("Confirm Restore", f"This will restore 'Start TC' from the 'Slate TC' field for {len(clips)} clips. This cannot be undone. Proceed?"):
-            self._log("Operation cancelled by user."); return
+            self._log("Operation cancelled by user."); self._flush_log(); return
 
         success_count, fail_count = 0, 0
         
-        for clip in clips:
-            slate_tc = clip.GetClipProperty("Slate TC")
+        for i, clip in enumerate(clips, 1):
+            if i % self._PROGRESS_EVERY == 0:
+                self._show_progress(f"Restoring: {i}/{len(clips)} clips")
+            slate_tc = self._get_clip_property(clip, "Slate TC")
             if slate_tc and slate_tc.strip():
                 if clip.SetClipProperty("Start TC", slate_tc):
-                    self._log(f"Restored TC for '{clip.GetName()}' to {slate_tc}"); success_count += 1
+                    self._log(f"Restored TC for '{self._get_clip_name(clip)}' to {slate_tc}"); success_count += 1
                 else:
-                    self._log(f"FAILED to restore TC for '{clip.GetName()}'"); fail_count += 1
+                    self._log(f"FAILED to restore TC for '{self._get_clip_name(clip)}'"); fail_count += 1
             else:
-                self._log(f"SKIPPED '{clip.GetName()}': No data in 'Slate TC'."); fail_count += 1
+                self._log(f"SKIPPED '{self._get_clip_name(clip)}': No data in 'Slate TC'."); fail_count += 1
         
         self._log(f"\n--- Restore Summary ---\nSuccessfully restored: {success_count} clips.\nFailed or skipped: {fail_count} clips.")
+        self._flush_log()
+        self._show_progress(f"Finished: {len(clips)} clips processed.")
         messagebox.showinfo("Restore Complete", f"Restored {success_count} clips.\nFailed or skipped {fail_count} clips.")
 
 
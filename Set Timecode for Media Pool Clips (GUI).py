@@ -6,6 +6,8 @@
 # - Set Start TC and/or Scene metadata from filename, creation, or modification date.
 # - Sub-second accuracy from filename used for Start TC frames.
 # - Option to backup Start TC to 'Slate TC' before overwriting.
+# - Properties that already hold the computed value are not rewritten; when Start TC is unchanged,
+#   'Slate TC' is left as it is rather than overwritten with the current Start TC.
 # - Mode to restore Start TC from 'Slate TC'.
 # - Rules for updating only empty fields, skipping timeline clips (uses "Usage" property).
 # - GUI for all options and summary report.
@@ -15,12 +17,16 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import os
 import datetime
-import math
+import collections
+import functools
 import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
 
 # --- Configuration ---
-EMPTY_TIMECODES = ["00:00:00:00", "00:00:00;00"]
-DEFAULT_EMPTY_SCENE_VALUES = ["", None, "0000-00-00 00:00:00"] # Common empty/default scene values
+EMPTY_TIMECODES = frozenset(["00:00:00:00", "00:00:00;00"]) # frozensets: O(1) hashed membership in is_prop_empty
+TC_PATTERN = re.compile(r"^\d{2}[:;]\d{2}[:;]\d{2}[:;]\d{2}$") # HH:MM:SS:FF or drop-frame HH;MM;SS;FF
+DEFAULT_EMPTY_SCENE_VALUES = frozenset(["", None, "0000-00-00 00:00:00"]) # Common empty/default scene values
 
 # Default GUI choices (can be overridden by user interaction)
 USER_OPERATION_MODE = 'set_properties'
@@ -32,6 +38,9 @@ USER_BACKUP_START_TC = False
 USER_UPDATE_ONLY_EMPTY = True
 USER_SKIP_TIMELINE_CLIPS = True
 USER_RESTORE_ONLY_EMPTY_TC = True
+USER_VERBOSE_LOG = True # Print per-clip details to the console
+USER_PARALLEL_SCAN = False # Process clips on worker threads
+PARALLEL_SCAN_WORKERS = 8
 
 # --- Filename Parsing (Using user's provided patterns with slight adjustment for ms capture) ---
 # Each pattern tuple: (compiled_regex, number_of_groups_including_optional_ms, ms_group_index_if_present_else_None)
@@ -46,48 +55,68 @@ PATTERNS_YMD_ONLY = [ # These patterns only capture YYYY, MM, DD
     (re.compile(r"(\d{4})(\d{2})(\d{2})"), 3, None) # General YYYYMMDD search
 ]
 
+# All five patterns fused into one alternation, in the same priority order as the lists above.
+# Each branch is wrapped in a named group (p0..p4); at any position `sre` tries the branches in
+# order, and the anchored ones can only match at position 0, so a single `search` reproduces the
+# old match-then-search ladder. _MASTER_LAYOUT records, per branch, the absolute index of its first
+# inner group and whether it carries H/M/S (+ optional ms) groups.
+_ALL_PATTERNS = PATTERNS_YMDHMS + PATTERNS_YMD_ONLY
+_MASTER_RE = re.compile(
+    "|".join(f"(?P<p{i}>{pattern.pattern})" for i, (pattern, _, _) in enumerate(_ALL_PATTERNS)),
+    re.IGNORECASE)
+_MASTER_LAYOUT = {
+    f"p{i}": (_MASTER_RE.groupindex[f"p{i}"] + 1, num_expected_groups >= 6, ms_group_idx)
+    for i, (_, num_expected_groups, ms_group_idx) in enumerate(_ALL_PATTERNS)
+}
+_GENERAL_YMD_GROUP = f"p{len(_ALL_PATTERNS) - 1}" # Branch of the general YYYYMMDD search
+_HAS_YEAR_DIGITS_RE = re.compile(r"\d{4}")
+
+# Scale for a 1-6 digit fraction-of-second string, indexed by its length ("5" -> 500000 us)
+_MS_MULTIPLIERS = (0, 100000, 10000, 1000, 100, 10, 1)
+
+@functools.lru_cache(maxsize=4096) # Pure function of the name; datetimes are immutable, so results can be shared
 def parse_datetime_from_filename(filename_str):
     base_name = os.path.splitext(filename_str)[0]
-    # Try patterns that include HMS first
-    for pattern_list in [PATTERNS_YMDHMS]: # Removed PATTERNS_YMDHMS_NO_MS, covered by optional ms
-        for pattern, num_expected_groups, ms_group_idx in pattern_list:
-            match = pattern.match(base_name) # `match` for anchored patterns
-            if not match and pattern.pattern.startswith(r"(\d{4})(\d{2})(\d{2})"): # If it's a generic date search like YYYYMMDD
-                match = pattern.search(base_name) # Use `search` for non-anchored general date patterns
-
-            if match:
-                groups = match.groups()
-                try:
-                    year, month, day = int(groups[0]), int(groups[1]), int(groups[2])
-                    hour, minute, second = 0, 0, 0 # Defaults if not in pattern
-                    microseconds = 0
-
-                    if num_expected_groups >= 6 : # Has H, M, S
-                         hour, minute, second = int(groups[3]), int(groups[4]), int(groups[5])
-
-                    if ms_group_idx is not None and len(groups) > ms_group_idx and groups[ms_group_idx]:
-                        ms_str = groups[ms_group_idx]
-                        microseconds = int((ms_str + "000000")[:6]) # Pad/truncate to 6 microsecond digits
-                    return datetime.datetime(year, month, day, hour, minute, second, microseconds)
-                except (ValueError, IndexError) as e:
-                    # print(f"Debug: ValueError/IndexError during HMS parsing for {pattern.pattern} with groups {groups}: {e}")
-                    continue
-    
-    # Try patterns that only get YMD
-    for pattern, num_expected_groups, _ in PATTERNS_YMD_ONLY: # ms_group_idx is None here
-        match = pattern.search(base_name) # Search for YMD_ONLY as it might be anywhere
-        if match:
-            groups = match.groups()
-            try:
-                year, month, day = int(groups[0]), int(groups[1]), int(groups[2])
-                return datetime.datetime(year, month, day, 0, 0, 0, 0) # Time defaults to midnight
-            except (ValueError, IndexError) as e:
-                # print(f"Debug: ValueError/IndexError during YMD_ONLY parsing for {pattern.pattern} with groups {groups}: {e}")
-                continue
-    return None
+    if not _HAS_YEAR_DIGITS_RE.search(base_name): # Cheap reject: every pattern needs a 4-digit year
+        return None
+    match = _MASTER_RE.search(base_name)
+    if not match:
+        return None
+    first, has_hms, ms_group_idx = _MASTER_LAYOUT[match.lastgroup]
+    groups = match.groups()
+    try:
+        year, month, day = int(groups[first - 1]), int(groups[first]), int(groups[first + 1])
+        hour, minute, second = 0, 0, 0 # Defaults if not in pattern (time defaults to midnight)
+        microseconds = 0
+        if has_hms: # Has H, M, S
+            hour, minute, second = int(groups[first + 2]), int(groups[first + 3]), int(groups[first + 4])
+        if ms_group_idx is not None and groups[first - 1 + ms_group_idx]:
+            ms_str = groups[first - 1 + ms_group_idx] # Always 1-6 digits, per the patterns' \d{1,6}
+            microseconds = int(ms_str) * _MS_MULTIPLIERS[len(ms_str)]
+        return datetime.datetime(year, month, day, hour, minute, second, microseconds)
+    except ValueError:
+        # Out-of-range fields (e.g. hour 26): as the old pattern ladder did, retry with the first bare
+        # YYYYMMDD in the name, and only give up (letting the caller fall back) if that is invalid too.
+        if match.lastgroup == _GENERAL_YMD_GROUP:
+            return None
+        general_match = PATTERNS_YMD_ONLY[-1][0].search(base_name)
+        if not general_match:
+            return None
+        try:
+            year, month, day = map(int, general_match.groups())
+            return datetime.datetime(year, month, day)
+        except ValueError:
+            return None
 
 
 # --- Core Logic ---
+# Per-run settings for the per-clip functions, passed as one immutable reference instead of a
+# growing argument list. A namedtuple rather than a frozen dataclass keeps the script runnable on
+# the older Python builds Resolve can be paired with.
+ClipRunConfig = collections.namedtuple('ClipRunConfig', [
+    'tl_fps', 'format_tc', 'log', 'primary_source', 'fallback_source', 'update_start_tc', 'update_scene',
+    'backup_start_tc', 'update_only_empty', 'skip_timeline_clips', 'restore_only_empty_tc'])
+
 def get_resolve_objects(): # Assumes 'resolve' is globally available and valid
     if 'resolve' not in globals() or not globals()['resolve']:
         print("CRITICAL ERROR: DaVinci Resolve 'resolve' object not found globally.")
@@ -112,140 +141,232 @@ def get_timeline_frame_rate(proj):
     try: return float(proj.GetSetting("timelineFrameRate"))
     except: return 24.0 # Default
 
-def format_timecode_str(h, m, s, f, is_drop):
-    sep = ";" if is_drop else ":"
-    return f"{int(h):02d}{sep}{int(m):02d}{sep}{int(s):02d}{sep}{int(f):02d}"
-
-def is_prop_empty(prop_value, empty_values_list):
+def make_timecode_formatter(is_drop):
+    # The drop-frame flag is per project, so build the template once and close over it
+    template = "%02d;%02d;%02d;%02d" if is_drop else "%02d:%02d:%02d:%02d"
+    def format_timecode_str(h, m, s, f):
+        return template % (h, m, s, f)
+    return format_timecode_str
+
+# One os.stat per file per run: existence and both timestamps come from the same struct,
+# and clips sharing a file (e.g. subclips) reuse it. Cleared at the start of each run.
+_stat_cache = {}
+
+def stat_file(path):
+    """Returns os.stat(path), or None if the file is missing or unreadable."""
+    if path not in _stat_cache:
+        try: _stat_cache[path] = os.stat(path)
+        except OSError: _stat_cache[path] = None
+    return _stat_cache[path]
+
+# Date sources by choice key: (stats key prefix, log label, reader taking (file_path, os.stat result)).
+# File times keep their microseconds, which become Start TC frames.
+DATE_SOURCES = {
+    'filename': ('filename', "Parsed from filename", lambda path, st: parse_datetime_from_filename(os.path.basename(path))),
+    'create': ('creation', "Using file creation time", lambda path, st: datetime.datetime.fromtimestamp(st.st_ctime)),
+    'modify': ('modification', "Using file modification time", lambda path, st: datetime.datetime.fromtimestamp(st.st_mtime)),
+}
+
+def is_prop_empty(prop_value, empty_values):
     if prop_value is None: return True
     if isinstance(prop_value, str) and not prop_value.strip(): return True
-    return prop_value in empty_values_list
-
-def process_clip_set_properties(clip, tl_fps, is_df, choices, stats):
+    return prop_value in empty_values
+
+# Whether this Resolve build accepts SetClipProperty({property: value}). None until the first
+# multi-property write finds out; once it has failed, clips go straight to per-property writes.
+# Reset at the start of each run.
+_dict_set_supported = None
+
+def set_clip_properties(clip, updates):
+    """Writes {property: value} to a clip and returns {property: succeeded}."""
+    # Several properties go in one SetClipProperty(dict) bridge call where this Resolve version
+    # accepts it; otherwise (False or a rejected argument) each property is set on its own.
+    global _dict_set_supported
+    if len(updates) > 1 and _dict_set_supported is not False:
+        try: ok = clip.SetClipProperty(updates)
+        except Exception: ok = False
+        if ok:
+            _dict_set_supported = True
+            return dict.fromkeys(updates, True)
+        if _dict_set_supported is None: _dict_set_supported = False
+    return {key: bool(clip.SetClipProperty(key, value)) for key, value in updates.items()}
+
+# The process_clip_* functions only read from the clip and work out what to change. They return
+# a callable that performs the clip's writes (and logs/counts their results), or None if there is
+# nothing to write, so the caller decides which thread talks to Resolve for writes.
+def process_clip_set_properties(clip, cfg, stats):
+    log = cfg.log
     clip_name = clip.GetName()
+    props = clip.GetClipProperty() or {} # One bridge call for every property read below
     stats['total_scanned'] += 1
-    print(f"Processing '{clip_name}' for Set Properties...")
+    log(f"Processing '{clip_name}' for Set Properties...")
 
-    if choices['skip_timeline_clips']:
+    if cfg.skip_timeline_clips:
         try:
-            usage_str = clip.GetClipProperty("Usage") # User's corrected way
+            usage_str = props.get("Usage") # User's corrected way
             if usage_str is not None and int(usage_str) > 0:
-                print(f"  Skipping: Used in timeline ({usage_str} times) and policy is to skip.")
+                log(f"  Skipping: Used in timeline ({usage_str} times) and policy is to skip.")
                 stats['skipped_in_timeline'] += 1; return
         except Exception as e:
-            print(f"  Warning: Error getting 'Usage' for '{clip_name}': {e}. Proceeding cautiously.")
+            log(f"  Warning: Error getting 'Usage' for '{clip_name}': {e}. Proceeding cautiously.")
             stats['errors_getting_usage'] += 1
 
-    file_path = clip.GetClipProperty("File Path")
-    if not file_path or not os.path.exists(file_path):
-        print(f"  Failed: Invalid file path ('{file_path}').")
-        stats['failed_no_path'] += 1; return
+    # Decide up front which fields will actually be written; a clip whose selected fields are all
+    # already set (with 'update only empty') needs no stat or date lookup at all.
+    original_start_tc = props.get("Start TC")
+    original_scene = props.get("Scene")
+    need_tc = cfg.update_start_tc and (not cfg.update_only_empty or is_prop_empty(original_start_tc, EMPTY_TIMECODES))
+    need_scene = cfg.update_scene and (not cfg.update_only_empty or is_prop_empty(original_scene, DEFAULT_EMPTY_SCENE_VALUES))
+    if cfg.update_start_tc and not need_tc:
+        log(f"  Skipping Start TC update: Not empty ('{original_start_tc}') and 'update only empty' selected.")
+        stats['skipped_start_tc_set'] +=1
+    if cfg.update_scene and not need_scene:
+        log(f"  Skipping Scene update: Not empty ('{original_scene}') and 'update only empty' selected.")
+        stats['skipped_scene_set'] +=1
+    if not (need_tc or need_scene):
+        if not (cfg.update_start_tc or cfg.update_scene): log("  Skipping: No properties selected for update.")
+        return
 
-    dt_object = None; source_used = "none"; effective_src = choices['primary_source']
-    if effective_src == 'filename':
-        stats['filename_attempts'] += 1
-        dt_object = parse_datetime_from_filename(os.path.basename(file_path))
-        if dt_object:
-            print(f"  Parsed from filename: {dt_object.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]}") # Show ms
-            stats['filename_success'] +=1; source_used = "filename"
-        else:
-            print(f"  Filename parsing failed. Using fallback: '{choices['fallback_source']}'.")
-            stats['filename_failed'] += 1; effective_src = choices['fallback_source']
+    file_path = props.get("File Path")
+    if not file_path:
+        log(f"  Failed: Invalid file path ('{file_path}').")
+        stats['failed_no_path'] += 1; return
 
-    if not dt_object:
-        ts_type_str = "creation" if effective_src == 'create' else "modification"
-        stats[f'{ts_type_str}_attempts'] +=1
+    # Try the primary source, then the fallback (only filename parsing can come up empty)
+    sources = [cfg.primary_source]
+    if sources[0] == 'filename': sources.append(cfg.fallback_source)
+    dt_object = None; source_used = "none"; file_stat = None
+    for src in sources:
+        stat_name, found_msg, resolve_dt = DATE_SOURCES[src]
+        if src != 'filename': # Only file times touch the filesystem; a parsed filename needs no stat()
+            file_stat = stat_file(file_path)
+            if file_stat is None:
+                log(f"  Failed: Invalid file path ('{file_path}').")
+                stats['failed_no_path'] += 1; return
+        stats[f'{stat_name}_attempts'] += 1
         try:
-            ts_float = os.path.getctime(file_path) if effective_src == 'create' else os.path.getmtime(file_path)
-            dt_object = datetime.datetime.fromtimestamp(ts_float) # This will have microseconds
-            source_used = effective_src
-            print(f"  Using file {ts_type_str} time: {dt_object.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]}") # Show ms
-            stats[f'{ts_type_str}_success'] +=1
+            dt_object = resolve_dt(file_path, file_stat)
         except Exception as e:
-            print(f"  Error getting {ts_type_str} timestamp: {e}")
+            log(f"  Error getting {stat_name} timestamp: {e}")
             stats['failed_other'] += 1; return
+        if dt_object:
+            log(f"  {found_msg}: {dt_object.isoformat(' ', 'milliseconds')}") # Show ms
+            stats[f'{stat_name}_success'] += 1; source_used = src
+            break
+        log(f"  Filename parsing failed. Using fallback: '{cfg.fallback_source}'.")
+        stats[f'{stat_name}_failed'] += 1
 
     if not dt_object:
-        print(f"  Failed: Could not determine valid timestamp."); stats['failed_other'] += 1; return
-
-    if choices['update_start_tc']:
-        original_start_tc = clip.GetClipProperty("Start TC")
-        if choices['update_only_empty'] and not is_prop_empty(original_start_tc, EMPTY_TIMECODES):
-            print(f"  Skipping Start TC update: Not empty ('{original_start_tc}') and 'update only empty' selected.")
-            stats['skipped_start_tc_set'] +=1
+        log(f"  Failed: Could not determine valid timestamp."); stats['failed_other'] += 1; return
+
+    # Stage every write for this clip, then send them together (see set_clip_properties)
+    # Values that already match are not rewritten (e.g. on re-runs without 'update only empty')
+    updates = {}
+    if need_tc:
+        frames = int((dt_object.microsecond / 1000000.0) * cfg.tl_fps) # Non-negative, so int() floors
+        new_start_tc = cfg.format_tc(dt_object.hour, dt_object.minute, dt_object.second, frames)
+        if new_start_tc == original_start_tc:
+            # No backup either: 'Slate TC' keeps whatever it holds (e.g. the backup from an earlier run)
+            # instead of being overwritten with the current, unchanged Start TC.
+            log(f"  Start TC already '{new_start_tc}'; nothing to write.")
         else:
-            if choices['backup_start_tc']:
+            if cfg.backup_start_tc:
                 if not is_prop_empty(original_start_tc, EMPTY_TIMECODES): # Only backup non-empty TCs
-                    if clip.SetClipProperty("Slate TC", original_start_tc):
-                        print(f"  Backed up Start TC '{original_start_tc}' to 'Slate TC'.")
-                        stats['tc_backup_success'] +=1
-                    else:
-                        print(f"  Failed to backup Start TC to 'Slate TC'.")
-                        stats['tc_backup_failed'] +=1
+                    updates["Slate TC"] = original_start_tc
                 else:
-                     print(f"  Skipping backup of Start TC: Original is empty/default ('{original_start_tc}').")
+                     log(f"  Skipping backup of Start TC: Original is empty/default ('{original_start_tc}').")
+            updates["Start TC"] = new_start_tc
+
+    if need_scene:
+        # For Scene, use YYYY-MM-DD HH:MM:SS. Sub-second for Scene is TBD by Resolve's capabilities for this field.
+        # If milliseconds are desired and supported, change format string.
+        new_scene_str = dt_object.isoformat(' ', 'seconds')
+        # To include milliseconds: new_scene_str = dt_object.isoformat(' ', 'milliseconds')
+        if new_scene_str == original_scene:
+            log(f"  Scene already '{new_scene_str}'; nothing to write.")
+        else:
+            updates["Scene"] = new_scene_str
+
+    if not updates:
+        stats['skipped_noop'] += 1; return
 
+    def write_updates():
+        written = set_clip_properties(clip, updates)
 
-            frames = math.floor((dt_object.microsecond / 1000000.0) * tl_fps)
-            new_start_tc = format_timecode_str(dt_object.hour, dt_object.minute, dt_object.second, frames, is_df)
-            if clip.SetClipProperty("Start TC", new_start_tc):
-                print(f"  Set Start TC to '{new_start_tc}' (from {source_used}, frames from ms: {dt_object.microsecond}).")
+        if "Slate TC" in written:
+            if written["Slate TC"]:
+                log(f"  Backed up Start TC '{original_start_tc}' to 'Slate TC'.")
+                stats['tc_backup_success'] +=1
+            else:
+                log(f"  Failed to backup Start TC to 'Slate TC'.")
+                stats['tc_backup_failed'] +=1
+
+        if "Start TC" in written:
+            if written["Start TC"]:
+                log(f"  Set Start TC to '{new_start_tc}' (from {source_used}, frames from ms: {dt_object.microsecond}).")
                 stats['start_tc_updated'] += 1
                 stats[f'start_tc_from_{source_used}'] +=1
             else:
-                print(f"  Failed to set Start TC to '{new_start_tc}'.")
+                log(f"  Failed to set Start TC to '{new_start_tc}'.")
                 stats['failed_set_start_tc'] += 1
 
-    if choices['update_scene']:
-        original_scene = clip.GetClipProperty("Scene")
-        if choices['update_only_empty'] and not is_prop_empty(original_scene, DEFAULT_EMPTY_SCENE_VALUES):
-            print(f"  Skipping Scene update: Not empty ('{original_scene}') and 'update only empty' selected.")
-            stats['skipped_scene_set'] +=1
-        else:
-            # For Scene, use YYYY-MM-DD HH:MM:SS. Sub-second for Scene is TBD by Resolve's capabilities for this field.
-            # If milliseconds are desired and supported, change format string.
-            new_scene_str = dt_object.strftime('%Y-%m-%d %H:%M:%S')
-            # To include milliseconds: new_scene_str = dt_object.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
-            if clip.SetClipProperty("Scene", new_scene_str):
-                print(f"  Set Scene to '{new_scene_str}' (from {source_used}).")
+        if "Scene" in written:
+            if written["Scene"]:
+                log(f"  Set Scene to '{new_scene_str}' (from {source_used}).")
                 stats['scene_updated'] += 1
                 stats[f'scene_from_{source_used}'] +=1
             else:
-                print(f"  Failed to set Scene to '{new_scene_str}'.")
+                log(f"  Failed to set Scene to '{new_scene_str}'.")
                 stats['failed_set_scene'] +=1
+    return write_updates
 
-def process_clip_restore_tc(clip, choices, stats):
+def process_clip_restore_tc(clip, cfg, stats):
+    log = cfg.log
     clip_name = clip.GetName()
+    props = clip.GetClipProperty() or {}
     stats['total_scanned'] += 1
-    print(f"Processing '{clip_name}' for Restore Start TC...")
+    log(f"Processing '{clip_name}' for Restore Start TC...")
 
-    if choices['skip_timeline_clips']:
+    if cfg.skip_timeline_clips:
         try:
-            usage_str = clip.GetClipProperty("Usage")
+            usage_str = props.get("Usage")
             if usage_str is not None and int(usage_str) > 0:
-                print(f"  Skipping: Used in timeline ({usage_str} times) and policy is to skip.")
+                log(f"  Skipping: Used in timeline ({usage_str} times) and policy is to skip.")
                 stats['skipped_in_timeline'] += 1; return
         except Exception as e:
-            print(f"  Warning: Error getting 'Usage' for '{clip_name}': {e}.") # No cautious proceeding, just warn
+            log(f"  Warning: Error getting 'Usage' for '{clip_name}': {e}.") # No cautious proceeding, just warn
             stats['errors_getting_usage'] += 1
 
-    slate_tc = clip.GetClipProperty("Slate TC")
+    slate_tc = props.get("Slate TC")
     # Check if slate_tc is a valid timecode string (basic check, could be more robust)
-    if is_prop_empty(slate_tc, []) or not re.match(r"^\d{2}[:;]\d{2}[:;]\d{2}[:;]\d{2}$", slate_tc):
-        print(f"  Skipping restore: 'Slate TC' is empty or not a valid TC format ('{slate_tc}').")
+    if is_prop_empty(slate_tc, ()) or not TC_PATTERN.match(slate_tc):
+        log(f"  Skipping restore: 'Slate TC' is empty or not a valid TC format ('{slate_tc}').")
         stats['restore_skipped_no_slate_tc'] +=1; return
 
-    current_start_tc = clip.GetClipProperty("Start TC")
-    if choices['restore_only_empty_tc'] and not is_prop_empty(current_start_tc, EMPTY_TIMECODES):
-        print(f"  Skipping restore: Current Start TC ('{current_start_tc}') not empty and 'restore only empty' selected.")
+    current_start_tc = props.get("Start TC")
+    if cfg.restore_only_empty_tc and not is_prop_empty(current_start_tc, EMPTY_TIMECODES):
+        log(f"  Skipping restore: Current Start TC ('{current_start_tc}') not empty and 'restore only empty' selected.")
         stats['restore_skipped_tc_not_empty'] +=1; return
 
-    if clip.SetClipProperty("Start TC", slate_tc):
-        print(f"  Restored Start TC to '{slate_tc}' from 'Slate TC'.")
-        stats['tc_restored'] += 1
-    else:
-        print(f"  Failed to restore Start TC from 'Slate TC'.")
-        stats['failed_tc_restore'] += 1
+    def write_restore():
+        if clip.SetClipProperty("Start TC", slate_tc):
+            log(f"  Restored Start TC to '{slate_tc}' from 'Slate TC'.")
+            stats['tc_restored'] += 1
+        else:
+            log(f"  Failed to restore Start TC from 'Slate TC'.")
+            stats['failed_tc_restore'] += 1
+    return write_restore
+
+def get_all_clips(root_folder):
+    clips = []
+    # Explicit stack instead of recursion, so deep bin trees can't hit the recursion limit
+    stack = [root_folder]
+    while stack:
+        folder = stack.pop()
+        clips.extend(folder.GetClipList() or [])
+        # Reversed so subfolders are still visited in bin order
+        stack.extend(reversed(folder.GetSubFolderList() or []))
+    return clips
 
 def iterate_media_pool(choices, stats):
     _, _, proj, pool = get_resolve_objects()
@@ -255,6 +376,7 @@ def iterate_media_pool(choices, stats):
 
     tl_fps = get_timeline_frame_rate(proj)
     is_df = proj.GetSetting("timelineDropFrameTimecode") == "1"
+    format_tc = make_timecode_formatter(is_df)
 
     print(f"Project: {proj.GetName()}, FPS: {tl_fps}, DropFrame: {is_df}")
     print(f"Operation Mode: {choices['operation_mode']}")
@@ -267,81 +389,90 @@ def iterate_media_pool(choices, stats):
     print(f" Update common rules -> Only if empty fields: {choices['update_only_empty']}; Skip timeline clips: {choices['skip_timeline_clips']}")
     print("--- Starting Media Pool Scan ---")
 
-    def process_folder(folder):
-        clips = folder.GetClipList()
-        if clips:
-            for clip_idx, clip_obj in enumerate(clips): # Use enumerate for better logging if needed
-                if choices['operation_mode'] == 'set_properties':
-                    process_clip_set_properties(clip_obj, tl_fps, is_df, choices, stats)
-                elif choices['operation_mode'] == 'restore_tc':
-                    process_clip_restore_tc(clip_obj, choices, stats)
-        subfolders = folder.GetSubFolderList()
-        if subfolders:
-            for subfolder_idx, subfolder_obj in enumerate(subfolders):
-                process_folder(subfolder_obj)
-    process_folder(pool.GetRootFolder())
+    # Per-clip lines are collected and written to the console once per clip rather than print()ed
+    # one at a time; with verbose logging off they are dropped without being stored.
+    clip_msgs = []
+    cfg = ClipRunConfig(
+        tl_fps=tl_fps, format_tc=format_tc,
+        log=clip_msgs.append if choices['verbose_log'] else (lambda msg: None),
+        primary_source=choices['primary_source'], fallback_source=choices['fallback_source'],
+        update_start_tc=choices['update_start_tc'], update_scene=choices['update_scene'],
+        backup_start_tc=choices['backup_start_tc'], update_only_empty=choices['update_only_empty'],
+        skip_timeline_clips=choices['skip_timeline_clips'], restore_only_empty_tc=choices['restore_only_empty_tc'])
+
+    if choices['operation_mode'] == 'set_properties':
+        process_clip = process_clip_set_properties
+    elif choices['operation_mode'] == 'restore_tc':
+        process_clip = process_clip_restore_tc
+    else:
+        process_clip = None
+    clips = get_all_clips(pool.GetRootFolder()) if process_clip else []
+
+    if choices['parallel_scan']:
+        # Reads, stat() and date resolution run in the pool; they are dominated by Resolve bridge
+        # calls and file I/O, which release the GIL. Each task gets its own log buffer and counters.
+        # Results come back in clip order and every SetClipProperty write happens here on the
+        # calling thread, so writes are never issued to Resolve concurrently.
+        def plan_clip(clip_obj):
+            task_msgs, task_stats = [], collections.Counter()
+            write_clip = process_clip(clip_obj, cfg._replace(log=task_msgs.append) if choices['verbose_log'] else cfg, task_stats)
+            return task_msgs, task_stats, write_clip
+        with ThreadPoolExecutor(max_workers=PARALLEL_SCAN_WORKERS) as executor:
+            for task_msgs, task_stats, write_clip in executor.map(plan_clip, clips):
+                if write_clip: write_clip()
+                if task_msgs:
+                    sys.stdout.write("\n".join(task_msgs) + "\n")
+                stats.update(task_stats)
+    else:
+        for clip_obj in clips:
+            write_clip = process_clip(clip_obj, cfg, stats)
+            if write_clip: write_clip()
+            if clip_msgs:
+                sys.stdout.write("\n".join(clip_msgs) + "\n")
+                clip_msgs.clear()
     print("\n--- Scan Finished ---")
 
 def run_script_with_choices(choices):
-    stats_keys = [
-        'total_scanned', 'skipped_in_timeline', 'errors_getting_usage', 'failed_no_path',
-        'filename_attempts', 'filename_success', 'filename_failed',
-        'creation_attempts', 'creation_success', 'modification_attempts', 'modification_success',
-        'failed_other', 'start_tc_updated', 'scene_updated', 'tc_backup_success', 'tc_backup_failed',
-        'skipped_start_tc_set', 'skipped_scene_set', 'failed_set_start_tc', 'failed_set_scene',
-        'tc_restored', 'restore_skipped_no_slate_tc', 'restore_skipped_tc_not_empty', 'failed_tc_restore']
-    # Add source-specific update counts dynamically
-    for prop in ['start_tc', 'scene']:
-        for src in ['filename', 'create', 'modify']:
-            stats_keys.append(f'{prop}_from_{src}')
-    stats = {key: 0 for key in stats_keys}
+    stats = collections.Counter() # Missing keys read as 0, so counters need no up-front declaration
 
+    global _dict_set_supported
+    _stat_cache.clear() # Files may have changed since the last run
+    _dict_set_supported = None
     iterate_media_pool(choices, stats)
 
+    # Zero counts are left out, except the scan total, backup line and failure counts, which are always shown
     summary_lines = [f"Total clips scanned: {stats['total_scanned']}"]
     if choices['operation_mode'] == 'set_properties':
-        if stats['start_tc_updated'] > 0:
+        if stats['start_tc_updated']:
             summary_lines.append(f"Start TC updated: {stats['start_tc_updated']} (File: {stats['start_tc_from_filename']}, Create: {stats['start_tc_from_create']}, Modify: {stats['start_tc_from_modify']})")
-        if stats['scene_updated'] > 0:
+        if stats['scene_updated']:
             summary_lines.append(f"Scene updated: {stats['scene_updated']} (File: {stats['scene_from_filename']}, Create: {stats['scene_from_create']}, Modify: {stats['scene_from_modify']})")
         if choices['update_start_tc'] and choices['backup_start_tc']:
-             summary_lines.append(f"Start TC backups to 'Slate TC': {stats['tc_backup_success']} (Failed: {stats['tc_backup_failed']})")
-        if choices['primary_source'] == 'filename':
-            summary_lines.extend([
-                f"Filename parsing: {stats['filename_attempts']} attempts, {stats['filename_success']} succeeded, {stats['filename_failed']} used fallback."
-            ])
+            summary_lines.append(f"Start TC backups to 'Slate TC': {stats['tc_backup_success']} (Failed: {stats['tc_backup_failed']})")
+        if choices['primary_source'] == 'filename' and stats['filename_attempts']:
+            summary_lines.append(f"Filename parsing: {stats['filename_attempts']} attempts, {stats['filename_success']} succeeded, {stats['filename_failed']} used fallback.")
     elif choices['operation_mode'] == 'restore_tc':
-        summary_lines.append(f"Start TC restored from 'Slate TC': {stats['tc_restored']}")
+        if stats['tc_restored']: summary_lines.append(f"Start TC restored from 'Slate TC': {stats['tc_restored']}")
         if stats['restore_skipped_no_slate_tc']: summary_lines.append(f"  Skipped (no/invalid Slate TC): {stats['restore_skipped_no_slate_tc']}")
         if stats['restore_skipped_tc_not_empty']: summary_lines.append(f"  Skipped (Start TC not empty): {stats['restore_skipped_tc_not_empty']}")
 
+    if stats['skipped_in_timeline']: summary_lines.append(f"Skipped (in timeline): {stats['skipped_in_timeline']}")
+    if stats['skipped_start_tc_set']: summary_lines.append(f"Skipped (Start TC already set): {stats['skipped_start_tc_set']}")
+    if stats['skipped_scene_set']: summary_lines.append(f"Skipped (Scene already set): {stats['skipped_scene_set']}")
+    if stats['skipped_noop']: summary_lines.append(f"Skipped (already up to date): {stats['skipped_noop']}")
     summary_lines.extend([
-        f"Skipped (in timeline): {stats['skipped_in_timeline']}",
-        f"Skipped (Start TC already set): {stats['skipped_start_tc_set']}",
-        f"Skipped (Scene already set): {stats['skipped_scene_set']}",
         f"Failed (no path): {stats['failed_no_path']}",
         f"Failed (set Start TC): {stats['failed_set_start_tc']}",
         f"Failed (set Scene): {stats['failed_set_scene']}",
         f"Failed (restore TC): {stats['failed_tc_restore']}",
         f"Failed (other errors): {stats['failed_other']}",
     ])
-    if stats['errors_getting_usage'] > 0:
+    if stats['errors_getting_usage']:
         summary_lines.append(f"Timeline usage check issues: {stats['errors_getting_usage']}")
-    if sum(stats[k] for k in ['start_tc_updated', 'scene_updated', 'tc_restored']) > 0 :
+    if stats['start_tc_updated'] or stats['scene_updated'] or stats['tc_restored']:
         summary_lines.append("\nNote: You may need to re-sort Media Pool bins by the updated property.")
 
-    # Filter out lines showing "0" unless it's essential like "total_scanned" or a failure count.
-    filtered_summary_lines = []
-    for line in summary_lines:
-        is_essential = "scanned" in line.lower() or "fail" in line.lower() or "error" in line.lower() or "issue" in line.lower()
-        # Check if the line reports a zero count for a non-essential item
-        reports_zero = any(val in line for val in [": 0", "(0)"]) and not any(val in line for val in ["(Failed: 0)"]) # Keep "Failed: 0"
-
-        if is_essential or not reports_zero or (reports_zero and "Failed: 0" in line) : # Keep "Failed: 0"
-             filtered_summary_lines.append(line)
-
-
-    final_summary = "\n".join(filtered_summary_lines)
+    final_summary = "\n".join(summary_lines)
     print(final_summary)
     messagebox.showinfo("Script Execution Summary", final_summary)
 
@@ -349,6 +480,7 @@ def run_script_with_choices(choices):
 # --- GUI Setup ---
 def show_options_gui():
     root = tk.Tk()
+    root.withdraw() # Stay hidden while widgets are built and the window is centred, so it is painted once in place
     root.title("Timecode & Scene Utility V4.1")
     try: root.attributes('-topmost', True)
     except tk.TclError: pass
@@ -362,6 +494,8 @@ def show_options_gui():
     upd_empty_var = tk.BooleanVar(value=USER_UPDATE_ONLY_EMPTY)
     skip_tl_var = tk.BooleanVar(value=USER_SKIP_TIMELINE_CLIPS)
     restore_only_empty_var = tk.BooleanVar(value=USER_RESTORE_ONLY_EMPTY_TC)
+    verbose_log_var = tk.BooleanVar(value=USER_VERBOSE_LOG)
+    parallel_scan_var = tk.BooleanVar(value=USER_PARALLEL_SCAN)
 
     main_frame = ttk.Frame(root, padding="10")
     main_frame.grid(row=0, column=0, sticky="nsew")
@@ -407,46 +541,46 @@ def show_options_gui():
     common_behavior_frame.grid(row=2, column=0, columnspan=2, sticky="ew", padx=5, pady=5)
     ttk.Checkbutton(common_behavior_frame, text="Apply updates only if target field is empty", variable=upd_empty_var).pack(anchor="w")
     ttk.Checkbutton(common_behavior_frame, text="Skip clips used in timelines (Recommended)", variable=skip_tl_var).pack(anchor="w")
+    ttk.Checkbutton(common_behavior_frame, text="Print per-clip details to the console (slower on large pools)", variable=verbose_log_var).pack(anchor="w")
+    ttk.Checkbutton(common_behavior_frame, text="Parallel scan (process several clips at once)", variable=parallel_scan_var).pack(anchor="w")
 
     # --- GUI State Management Function ---
-    interactive_widgets_in_set_props = []
-    for frame in [target_frame, src_frame, fb_frame]: # fb_frame needs special logic below
-        for widget in frame.winfo_children():
-            if widget != cb_backup_tc and frame != fb_frame : # cb_backup_tc & fb_frame handled separately
-                 interactive_widgets_in_set_props.append(widget)
+    # Captured once as tuples; manage_gui_state never calls winfo_children() itself
+    interactive_widgets_in_set_props = tuple(
+        widget for frame in (target_frame, src_frame) for widget in frame.winfo_children()
+        if widget is not cb_backup_tc) # cb_backup_tc & fb_frame handled separately
+    interactive_widgets_in_fb_frame = tuple(fb_frame.winfo_children())
+    interactive_widgets_in_restore = tuple(restore_frame.winfo_children())
+
 
-    interactive_widgets_in_fb_frame = [w for w in fb_frame.winfo_children()]
-    interactive_widgets_in_restore = [w for w in restore_frame.winfo_children()]
+    # Last state pushed to each widget group; a trace write that doesn't change a group's state skips its configure() calls
+    applied_states = {}
 
+    def set_group_state(group, widgets, state):
+        if applied_states.get(group) != state:
+            applied_states[group] = state
+            for widget in widgets:
+                widget.configure(state=state)
 
     def manage_gui_state(*args):
         current_mode = op_mode_var.get()
         is_set_mode = current_mode == "set_properties"
         is_restore_mode = current_mode == "restore_tc"
 
-        # Enable/disable widgets in "Set Date/Time Options" frame
-        set_options_state = tk.NORMAL if is_set_mode else tk.DISABLED
-        for widget in interactive_widgets_in_set_props:
-            widget.configure(state=set_options_state)
-        cb_upd_start_tc.configure(state=set_options_state) # Ensure these specific ones are handled
-        cb_upd_scene.configure(state=set_options_state)
-
+        # Enable/disable widgets in "Set Date/Time Options" frame (includes the Start TC and Scene checkboxes)
+        set_group_state("set", interactive_widgets_in_set_props, tk.NORMAL if is_set_mode else tk.DISABLED)
 
         # Backup checkbox state
         can_backup = is_set_mode and upd_start_tc_var.get()
-        cb_backup_tc.configure(state=tk.NORMAL if can_backup else tk.DISABLED)
+        set_group_state("backup", (cb_backup_tc,), tk.NORMAL if can_backup else tk.DISABLED)
         if not can_backup: backup_tc_var.set(False)
 
         # Fallback frame state
         can_fallback = is_set_mode and (prim_src_var.get() == "filename")
-        fallback_state = tk.NORMAL if can_fallback else tk.DISABLED
-        for widget in interactive_widgets_in_fb_frame:
-            widget.configure(state=fallback_state)
+        set_group_state("fallback", interactive_widgets_in_fb_frame, tk.NORMAL if can_fallback else tk.DISABLED)
 
         # Enable/disable widgets in "Restore Options" frame
-        restore_options_state = tk.NORMAL if is_restore_mode else tk.DISABLED
-        for widget in interactive_widgets_in_restore:
-            widget.configure(state=restore_options_state)
+        set_group_state("restore", interactive_widgets_in_restore, tk.NORMAL if is_restore_mode else tk.DISABLED)
 
     op_mode_var.trace_add("write", manage_gui_state)
     prim_src_var.trace_add("write", manage_gui_state)
@@ -464,6 +598,7 @@ def show_options_gui():
             "backup_start_tc": backup_tc_var.get(),
             "update_only_empty": upd_empty_var.get(), "skip_timeline_clips": skip_tl_var.get(),
             "restore_only_empty_tc": restore_only_empty_var.get(),
+            "verbose_log": verbose_log_var.get(), "parallel_scan": parallel_scan_var.get(),
             "cancelled": False
         })
         root.destroy()
@@ -476,9 +611,11 @@ def show_options_gui():
 
     root.update_idletasks()
     min_w = 500 # Adjusted min width for more complex GUI
-    w = max(min_w, root.winfo_width()); h = root.winfo_height()
+    # Requested size: a withdrawn window has no mapped width/height yet
+    w = max(min_w, root.winfo_reqwidth()); h = root.winfo_reqheight()
     x = (root.winfo_screenwidth()//2)-(w//2); y = (root.winfo_screenheight()//2)-(h//2)
     root.geometry(f'{w}x{h}+{x}+{y}'); root.minsize(w,h)
+    root.deiconify()
     root.mainloop()
     return gui_result_data
 